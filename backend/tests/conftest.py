@@ -2,19 +2,24 @@
 Shared fixtures for RAG system tests
 """
 import pytest
+import importlib
 import sys
 import os
-from unittest.mock import Mock, MagicMock
+from unittest.mock import Mock, DEFAULT, patch
 from dataclasses import dataclass
+from types import SimpleNamespace
 
-# Add parent directory to path for imports
+# Add parent directory to path for imports. pytest loads conftest.py before
+# collecting the test modules, so this runs once per session.
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:] = dict.fromkeys(sys.path)
 
 from vector_store import SearchResults
 from models import Course, Lesson, CourseChunk
+from rag_system import RAGSystem
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MockConfig:
     """Mock configuration for testing"""
     ANTHROPIC_API_KEY: str = "test-api-key"
@@ -33,7 +38,44 @@ def mock_config():
     return MockConfig()
 
 
+@pytest.fixture(scope="module")
+def patched_rag_deps(request):
+    """Patch RAGSystem's external dependencies once per test module"""
+    mocks = patch.multiple(
+        "rag_system",
+        VectorStore=DEFAULT,
+        AIGenerator=DEFAULT,
+        SessionManager=DEFAULT,
+        DocumentProcessor=DEFAULT,
+    ).start()
+    request.addfinalizer(patch.stopall)
+    return mocks
+
+
 @pytest.fixture
+def rag_system_factory(patched_rag_deps):
+    """Provide a factory building RAGSystem instances on the shared patches"""
+    for mock in patched_rag_deps.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+
+    def factory(config=None):
+        return RAGSystem(config or MockConfig())
+
+    return factory
+
+
+@pytest.fixture(scope="module")
+def config_module():
+    """Provide the config module, imported once with a placeholder API key"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("ANTHROPIC_API_KEY", "test-api-key")
+        module = importlib.import_module("config")
+        yield module
+    # Drop the placeholder-key module so later importers re-read the real env
+    sys.modules.pop("config", None)
+
+
+@pytest.fixture(scope="session")
 def sample_course():
     """Provide a sample course for testing"""
     return Course(
@@ -48,7 +90,7 @@ def sample_course():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_chunks():
     """Provide sample course chunks for testing"""
     return [
@@ -73,7 +115,7 @@ def sample_chunks():
     ]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_search_results():
     """Provide mock search results"""
     return SearchResults(
@@ -89,7 +131,7 @@ def mock_search_results():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def empty_search_results():
     """Provide empty search results"""
     return SearchResults(
@@ -99,7 +141,7 @@ def empty_search_results():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def error_search_results():
     """Provide error search results"""
     return SearchResults(
@@ -110,9 +152,9 @@ def error_search_results():
     )
 
 
-@pytest.fixture
-def mock_vector_store():
-    """Provide a mock vector store"""
+@pytest.fixture(scope="session")
+def shared_mock_vector_store():
+    """Provide a single vector store mock reused across the session"""
     mock = Mock()
     mock.search = Mock(return_value=SearchResults(
         documents=["Test content about testing."],
@@ -126,47 +168,82 @@ def mock_vector_store():
     return mock
 
 
+@pytest.fixture
+def mock_vector_store(shared_mock_vector_store):
+    """Provide the shared vector store mock with its call history cleared"""
+    shared_mock_vector_store.reset_mock()
+    return shared_mock_vector_store
+
+
 @pytest.fixture
 def mock_anthropic_response():
     """Provide a mock Anthropic API response (text only)"""
-    mock_response = Mock()
-    mock_response.stop_reason = "end_turn"
-    mock_content = Mock()
-    mock_content.text = "This is a test response about the course content."
-    mock_content.type = "text"
-    mock_response.content = [mock_content]
-    return mock_response
+    return SimpleNamespace(
+        stop_reason="end_turn",
+        content=[
+            SimpleNamespace(
+                type="text",
+                text="This is a test response about the course content.",
+            )
+        ],
+    )
 
 
 @pytest.fixture
 def mock_anthropic_tool_response():
     """Provide a mock Anthropic API response with tool use"""
-    mock_response = Mock()
-    mock_response.stop_reason = "tool_use"
+    return SimpleNamespace(
+        stop_reason="tool_use",
+        content=[
+            # Text block
+            SimpleNamespace(type="text", text="Let me search for that information."),
+            # Tool use block
+            SimpleNamespace(
+                type="tool_use",
+                id="tool_call_123",
+                name="search_course_content",
+                input={"query": "MCP servers", "course_name": None, "lesson_number": None},
+            ),
+        ],
+    )
+
+
+@pytest.fixture
+def mock_anthropic_final_response():
+    """Provide a mock final response after tool execution"""
+    return SimpleNamespace(
+        stop_reason="end_turn",
+        content=[
+            SimpleNamespace(
+                type="text",
+                text="Based on the course materials, MCP servers are used for...",
+            )
+        ],
+    )
+
 
-    # Text block
-    mock_text = Mock()
-    mock_text.type = "text"
-    mock_text.text = "Let me search for that information."
+@pytest.fixture(scope="class")
+def shared_anthropic_client():
+    """Provide a single Anthropic client mock reused across a test class"""
+    return Mock()
 
-    # Tool use block
-    mock_tool_use = Mock()
-    mock_tool_use.type = "tool_use"
-    mock_tool_use.id = "tool_call_123"
-    mock_tool_use.name = "search_course_content"
-    mock_tool_use.input = {"query": "MCP servers", "course_name": None, "lesson_number": None}
 
-    mock_response.content = [mock_text, mock_tool_use]
-    return mock_response
+@pytest.fixture
+def anthropic_mock_client(shared_anthropic_client, mock_anthropic_response):
+    """Provide the shared client mock wired to return a text-only response"""
+    shared_anthropic_client.reset_mock(return_value=True, side_effect=True)
+    shared_anthropic_client.messages.create.return_value = mock_anthropic_response
+    return shared_anthropic_client
 
 
 @pytest.fixture
-def mock_anthropic_final_response():
-    """Provide a mock final response after tool execution"""
-    mock_response = Mock()
-    mock_response.stop_reason = "end_turn"
-    mock_content = Mock()
-    mock_content.text = "Based on the course materials, MCP servers are used for..."
-    mock_content.type = "text"
-    mock_response.content = [mock_content]
-    return mock_response
+def anthropic_mock_client_tool_use(
+    shared_anthropic_client, mock_anthropic_tool_response, mock_anthropic_final_response
+):
+    """Provide the shared client mock wired to request a tool, then answer"""
+    shared_anthropic_client.reset_mock(return_value=True, side_effect=True)
+    shared_anthropic_client.messages.create.side_effect = [
+        mock_anthropic_tool_response,
+        mock_anthropic_final_response,
+    ]
+    return shared_anthropic_client
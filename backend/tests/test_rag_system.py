@@ -8,51 +8,25 @@ These tests evaluate:
 4. Integration between components
 """
 import pytest
-import sys
+import importlib
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from unittest.mock import Mock, MagicMock, patch
-from dataclasses import dataclass
-
-
-@dataclass
-class MockConfig:
-    """Mock configuration for testing"""
-    ANTHROPIC_API_KEY: str = "test-api-key"
-    ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
-    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
-    CHUNK_SIZE: int = 800
-    CHUNK_OVERLAP: int = 100
-    MAX_RESULTS: int = 5
-    MAX_HISTORY: int = 2
-    CHROMA_PATH: str = "./test_chroma_db"
+from unittest.mock import DEFAULT, patch
+from rag_system import RAGSystem
+from ai_generator import AIGenerator
+from session_manager import SessionManager
+from tests.conftest import MockConfig
 
 
 class TestRAGSystemQueryHandling:
     """Tests for RAGSystem.query() method"""
     
-    @patch('rag_system.VectorStore')
-    @patch('rag_system.AIGenerator')
-    @patch('rag_system.SessionManager')
-    @patch('rag_system.DocumentProcessor')
-    def test_query_returns_response_and_sources(
-        self, mock_doc_proc, mock_session, mock_ai_gen, mock_vector_store
-    ):
+    def test_query_returns_response_and_sources(self, rag_system_factory):
         """Test that query returns both response and sources"""
-        from rag_system import RAGSystem
-        
         # Arrange
-        mock_ai_instance = Mock()
-        mock_ai_instance.generate_response.return_value = "This is the answer."
-        mock_ai_gen.return_value = mock_ai_instance
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history.return_value = None
-        mock_session.return_value = mock_session_instance
-        
-        config = MockConfig()
-        rag = RAGSystem(config)
+        rag = rag_system_factory()
+        rag.ai_generator.generate_response.return_value = "This is the answer."
+        rag.session_manager.get_conversation_history.return_value = None
         
         # Simulate sources being set by tool
         rag.tool_manager.tools["search_course_content"].last_sources = [
@@ -67,59 +41,29 @@ class TestRAGSystemQueryHandling:
         assert len(sources) == 1
         assert sources[0]["text"] == "Course A - Lesson 1"
     
-    @patch('rag_system.VectorStore')
-    @patch('rag_system.AIGenerator')
-    @patch('rag_system.SessionManager')
-    @patch('rag_system.DocumentProcessor')
-    def test_query_passes_tools_to_ai_generator(
-        self, mock_doc_proc, mock_session, mock_ai_gen, mock_vector_store
-    ):
+    def test_query_passes_tools_to_ai_generator(self, rag_system_factory):
         """Test that query provides tools to AIGenerator"""
-        from rag_system import RAGSystem
-        
         # Arrange
-        mock_ai_instance = Mock()
-        mock_ai_instance.generate_response.return_value = "Response"
-        mock_ai_gen.return_value = mock_ai_instance
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history.return_value = None
-        mock_session.return_value = mock_session_instance
-        
-        config = MockConfig()
-        rag = RAGSystem(config)
+        rag = rag_system_factory()
+        rag.ai_generator.generate_response.return_value = "Response"
+        rag.session_manager.get_conversation_history.return_value = None
         
         # Act
         rag.query("Test query")
         
         # Assert
-        call_kwargs = mock_ai_instance.generate_response.call_args[1]
+        call_kwargs = rag.ai_generator.generate_response.call_args[1]
         assert "tools" in call_kwargs
         assert call_kwargs["tools"] is not None
         assert len(call_kwargs["tools"]) > 0
         assert call_kwargs["tool_manager"] is not None
     
-    @patch('rag_system.VectorStore')
-    @patch('rag_system.AIGenerator')
-    @patch('rag_system.SessionManager')
-    @patch('rag_system.DocumentProcessor')
-    def test_query_resets_sources_after_retrieval(
-        self, mock_doc_proc, mock_session, mock_ai_gen, mock_vector_store
-    ):
+    def test_query_resets_sources_after_retrieval(self, rag_system_factory):
         """Test that sources are reset after being retrieved"""
-        from rag_system import RAGSystem
-        
         # Arrange
-        mock_ai_instance = Mock()
-        mock_ai_instance.generate_response.return_value = "Response"
-        mock_ai_gen.return_value = mock_ai_instance
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history.return_value = None
-        mock_session.return_value = mock_session_instance
-        
-        config = MockConfig()
-        rag = RAGSystem(config)
+        rag = rag_system_factory()
+        rag.ai_generator.generate_response.return_value = "Response"
+        rag.session_manager.get_conversation_history.return_value = None
         
         # Set initial sources
         rag.tool_manager.tools["search_course_content"].last_sources = [
@@ -144,42 +88,30 @@ class TestRAGSystemErrorHandling:
         When .env file is empty or missing ANTHROPIC_API_KEY, the config loads ""
         as the API key, and the Anthropic SDK raises TypeError on first API call.
         """
-        from rag_system import RAGSystem
-
         # Arrange - Config with empty API key (the bug!)
-        config = MockConfig()
-        config.ANTHROPIC_API_KEY = ""  # Empty key!
-
-        # This should work for initialization
-        with patch('rag_system.VectorStore'):
-            with patch('rag_system.DocumentProcessor'):
-                rag = RAGSystem(config)
+        config = MockConfig(ANTHROPIC_API_KEY="")  # Empty key!
+
+        # This should work for initialization - real AIGenerator and
+        # SessionManager even if the shared module patches are active
+        with patch.multiple(
+            'rag_system',
+            VectorStore=DEFAULT,
+            DocumentProcessor=DEFAULT,
+            AIGenerator=AIGenerator,
+            SessionManager=SessionManager,
+        ):
+            rag = RAGSystem(config)
 
         # Act & Assert - Query should fail with TypeError about authentication
         with pytest.raises(TypeError, match="Could not resolve authentication method"):
             rag.query("What is Python?")
     
-    @patch('rag_system.VectorStore')
-    @patch('rag_system.AIGenerator')
-    @patch('rag_system.SessionManager')
-    @patch('rag_system.DocumentProcessor')
-    def test_ai_generator_exception_propagates(
-        self, mock_doc_proc, mock_session, mock_ai_gen, mock_vector_store
-    ):
+    def test_ai_generator_exception_propagates(self, rag_system_factory):
         """Test that exceptions from AIGenerator propagate correctly"""
-        from rag_system import RAGSystem
-        
         # Arrange
-        mock_ai_instance = Mock()
-        mock_ai_instance.generate_response.side_effect = Exception("API Error")
-        mock_ai_gen.return_value = mock_ai_instance
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history.return_value = None
-        mock_session.return_value = mock_session_instance
-        
-        config = MockConfig()
-        rag = RAGSystem(config)
+        rag = rag_system_factory()
+        rag.ai_generator.generate_response.side_effect = Exception("API Error")
+        rag.session_manager.get_conversation_history.return_value = None
         
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -191,64 +123,34 @@ class TestRAGSystemErrorHandling:
 class TestRAGSystemSessionManagement:
     """Tests for session and conversation history handling"""
     
-    @patch('rag_system.VectorStore')
-    @patch('rag_system.AIGenerator')
-    @patch('rag_system.SessionManager')
-    @patch('rag_system.DocumentProcessor')
-    def test_query_gets_conversation_history_for_session(
-        self, mock_doc_proc, mock_session, mock_ai_gen, mock_vector_store
-    ):
+    def test_query_gets_conversation_history_for_session(self, rag_system_factory):
         """Test that conversation history is retrieved for sessions"""
-        from rag_system import RAGSystem
-        
         # Arrange
-        mock_ai_instance = Mock()
-        mock_ai_instance.generate_response.return_value = "Response"
-        mock_ai_gen.return_value = mock_ai_instance
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history.return_value = "Previous chat"
-        mock_session.return_value = mock_session_instance
-        
-        config = MockConfig()
-        rag = RAGSystem(config)
+        rag = rag_system_factory()
+        rag.ai_generator.generate_response.return_value = "Response"
+        rag.session_manager.get_conversation_history.return_value = "Previous chat"
         
         # Act
         rag.query("Follow-up question", session_id="session_123")
         
         # Assert
-        mock_session_instance.get_conversation_history.assert_called_with("session_123")
-        call_kwargs = mock_ai_instance.generate_response.call_args[1]
+        rag.session_manager.get_conversation_history.assert_called_with("session_123")
+        call_kwargs = rag.ai_generator.generate_response.call_args[1]
         assert call_kwargs["conversation_history"] == "Previous chat"
     
-    @patch('rag_system.VectorStore')
-    @patch('rag_system.AIGenerator')
-    @patch('rag_system.SessionManager')
-    @patch('rag_system.DocumentProcessor')
-    def test_query_adds_exchange_to_session(
-        self, mock_doc_proc, mock_session, mock_ai_gen, mock_vector_store
-    ):
+    def test_query_adds_exchange_to_session(self, rag_system_factory):
         """Test that query and response are added to session history"""
-        from rag_system import RAGSystem
-        
         # Arrange
-        mock_ai_instance = Mock()
-        mock_ai_instance.generate_response.return_value = "The answer is 42."
-        mock_ai_gen.return_value = mock_ai_instance
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history.return_value = None
-        mock_session.return_value = mock_session_instance
-        
-        config = MockConfig()
-        rag = RAGSystem(config)
+        rag = rag_system_factory()
+        rag.ai_generator.generate_response.return_value = "The answer is 42."
+        rag.session_manager.get_conversation_history.return_value = None
         
         # Act
         rag.query("What is the answer?", session_id="session_456")
         
         # Assert
-        mock_session_instance.add_exchange.assert_called_once()
-        call_args = mock_session_instance.add_exchange.call_args[0]
+        rag.session_manager.add_exchange.assert_called_once()
+        call_args = rag.session_manager.add_exchange.call_args[0]
         assert call_args[0] == "session_456"
         assert "What is the answer?" in call_args[1]
         assert call_args[2] == "The answer is 42."
@@ -257,32 +159,26 @@ class TestRAGSystemSessionManagement:
 class TestRAGSystemIntegration:
     """Integration tests for the full query flow"""
     
-    @patch('rag_system.VectorStore')
-    @patch('rag_system.SessionManager')
-    @patch('rag_system.DocumentProcessor')
-    def test_full_query_flow_with_valid_api_key(
-        self, mock_doc_proc, mock_session, mock_vector_store
-    ):
+    @pytest.mark.skipif(
+        os.getenv("ANTHROPIC_API_KEY", "") in ("", "test-api-key"),
+        reason="Skipping integration test - no real API key",
+    )
+    def test_full_query_flow_with_valid_api_key(self):
         """
-        Integration test: Full query flow with mocked external dependencies.
-        This tests the actual AIGenerator with a mock API key scenario.
+        Integration test: Full query flow against the real Anthropic API.
+        Only the vector store and document processor are stubbed out.
         """
-        from rag_system import RAGSystem
-        
-        # Skip if no real API key (this is an integration test)
-        api_key = os.getenv("ANTHROPIC_API_KEY", "")
-        if not api_key or api_key == "test-api-key":
-            pytest.skip("Skipping integration test - no real API key")
-        
         # Arrange
-        mock_session_instance = Mock()
-        mock_session_instance.get_conversation_history.return_value = None
-        mock_session.return_value = mock_session_instance
+        config = MockConfig(ANTHROPIC_API_KEY=os.getenv("ANTHROPIC_API_KEY"))
         
-        config = MockConfig()
-        config.ANTHROPIC_API_KEY = api_key
-        
-        rag = RAGSystem(config)
+        with patch.multiple(
+            'rag_system',
+            VectorStore=DEFAULT,
+            DocumentProcessor=DEFAULT,
+            AIGenerator=AIGenerator,
+            SessionManager=SessionManager,
+        ):
+            rag = RAGSystem(config)
         
         # Act
         response, sources = rag.query("Hello")
@@ -296,34 +192,10 @@ class TestRAGSystemIntegration:
 class TestConfigValidation:
     """Tests for configuration validation"""
 
-    def test_config_raises_error_on_missing_api_key(self, monkeypatch):
+    def test_config_raises_error_on_missing_api_key(self, config_module, monkeypatch):
         """Test that config validation catches missing API key at startup"""
-        import importlib
-
-        # Mock os.getenv to return empty string for API key
-        original_getenv = os.getenv
-        def mock_getenv(key, default=""):
-            if key == "ANTHROPIC_API_KEY":
-                return ""
-            return original_getenv(key, default)
-
-        # Remove cached config module
-        if "config" in sys.modules:
-            del sys.modules["config"]
-
-        try:
-            # Patch os.getenv before importing config
-            monkeypatch.setattr(os, "getenv", mock_getenv)
-
-            # Importing config should raise ValueError
-            with pytest.raises(ValueError, match="ANTHROPIC_API_KEY not set"):
-                importlib.import_module("config")
-
-        finally:
-            # Clean up cached module
-            if "config" in sys.modules:
-                del sys.modules["config"]
-
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "")
 
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+        # Re-executing config should raise ValueError
+        with pytest.raises(ValueError, match="ANTHROPIC_API_KEY not set"):
+            importlib.reload(config_module)
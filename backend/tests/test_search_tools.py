@@ -8,209 +8,262 @@ These tests evaluate:
 4. Source tracking (last_sources population)
 """
 import pytest
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from unittest.mock import Mock, MagicMock
+from collections.abc import Iterator
 from search_tools import CourseSearchTool, ToolManager
 from vector_store import SearchResults
 
 
+# Shared, read-only search payloads - built once at import time
+_EMPTY = SearchResults(documents=[], metadata=[], distances=[])
+_ERROR = SearchResults.empty("Search error: Connection failed")
+_ONE_HIT = SearchResults(
+    documents=["This is lesson content about Python basics."],
+    metadata=[{"course_title": "Python 101", "lesson_number": 1}],
+    distances=[0.5]
+)
+_NO_LESSON_HIT = SearchResults(
+    documents=["Course overview content"],
+    metadata=[{"course_title": "Python 101", "lesson_number": None}],
+    distances=[0.4]
+)
+_TWO_HITS = SearchResults(
+    documents=["Content 1", "Content 2"],
+    metadata=[
+        {"course_title": "Course A", "lesson_number": 1},
+        {"course_title": "Course B", "lesson_number": 2}
+    ],
+    distances=[0.3, 0.5]
+)
+_TEST_HIT = SearchResults(
+    documents=["content"],
+    metadata=[{"course_title": "Test", "lesson_number": 1}],
+    distances=[0.5]
+)
+_RESULTS_CACHE = {
+    "success": _ONE_HIT,
+    "empty": _EMPTY,
+    "error": _ERROR,
+    "no_lesson": _NO_LESSON_HIT,
+    "two_hits": _TWO_HITS,
+}
+_LINKS_AB = ("https://example.com/a/1", "https://example.com/b/2")
+_SOURCES_AB = [
+    {"text": "Course A - Lesson 1", "link": "https://example.com/a/1"},
+    {"text": "Course B - Lesson 2", "link": "https://example.com/b/2"},
+]
+
+
+class StubStore:
+    """Hand-written stand-in for VectorStore with pre-canned results
+
+    Tests set ``_res`` to the SearchResults returned by search() and
+    ``_link`` to the lesson link (or an iterator of links, one per call).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear canned results and recorded calls"""
+        self._res = None
+        self._link = None
+        self.last_kw = None
+        self.search_count = 0
+
+    def search(self, **kw):
+        self.search_count += 1
+        self.last_kw = kw
+        return self._res
+
+    def get_lesson_link(self, course_title, lesson_number):
+        if isinstance(self._link, Iterator):
+            return next(self._link)
+        return self._link
+
+
+@pytest.fixture(scope="session")
+def tool_and_store():
+    """Provide a CourseSearchTool wired to a stub vector store, built once"""
+    store = StubStore()
+    return CourseSearchTool(store), store
+
+
+@pytest.fixture(scope="session")
+def manager_with_tool():
+    """Provide a ToolManager with a registered CourseSearchTool, built once"""
+    manager = ToolManager()
+    store = StubStore()
+    tool = CourseSearchTool(store)
+    manager.register_tool(tool)
+    return manager, tool, store
+
+
+@pytest.fixture(scope="session")
+def bench_results():
+    """Provide a 100-hit payload for benchmarking result formatting"""
+    return SearchResults(
+        documents=["x"] * 100,
+        metadata=[{"course_title": "C", "lesson_number": i} for i in range(100)],
+        distances=[0.1] * 100
+    )
+
+
+@pytest.fixture
+def prebuilt_results(request):
+    """Look up a shared SearchResults payload by key (use with indirect=)"""
+    return _RESULTS_CACHE[request.param]
+
+
+EXECUTE_CASES = [
+    pytest.param(
+        "success",
+        {"query": "Python basics"},
+        "[Python 101 - Lesson 1]\nThis is lesson content about Python basics.",
+        {"query": "Python basics", "course_name": None, "lesson_number": None},
+        None,
+        None,
+        id="success",
+    ),
+    pytest.param(
+        "empty",
+        {"query": "nonexistent topic"},
+        "No relevant content found",
+        {"query": "nonexistent topic", "course_name": None, "lesson_number": None},
+        None,
+        None,
+        id="empty_results",
+    ),
+    pytest.param(
+        "error",
+        {"query": "any query"},
+        "Search error",
+        {"query": "any query", "course_name": None, "lesson_number": None},
+        None,
+        None,
+        id="search_error",
+    ),
+    pytest.param(
+        "empty",
+        {"query": "test", "course_name": "Python 101"},
+        "No relevant content found in course 'Python 101'",
+        {"query": "test", "course_name": "Python 101", "lesson_number": None},
+        None,
+        None,
+        id="course_filter",
+    ),
+    pytest.param(
+        "empty",
+        {"query": "test", "lesson_number": 3},
+        "No relevant content found in lesson 3",
+        {"query": "test", "course_name": None, "lesson_number": 3},
+        None,
+        None,
+        id="lesson_filter",
+    ),
+    pytest.param(
+        "no_lesson",
+        {"query": "overview"},
+        "[Python 101]\nCourse overview content",  # No lesson in header
+        {"query": "overview", "course_name": None, "lesson_number": None},
+        None,
+        None,
+        id="missing_lesson_number",
+    ),
+    pytest.param(
+        "two_hits",
+        {"query": "test"},
+        "[Course A - Lesson 1]\nContent 1",
+        {"query": "test", "course_name": None, "lesson_number": None},
+        _LINKS_AB,
+        _SOURCES_AB,
+        id="populates_last_sources",
+    ),
+]
+
+
 class TestCourseSearchToolExecute:
     """Tests for CourseSearchTool.execute() method"""
     
-    def setup_method(self):
-        """Set up mock vector store for each test"""
-        self.mock_store = Mock()
-        self.tool = CourseSearchTool(self.mock_store)
-    
-    def test_execute_returns_formatted_results_on_success(self):
-        """Test that execute returns properly formatted results when content is found"""
-        # Arrange: Mock successful search results
-        mock_results = SearchResults(
-            documents=["This is lesson content about Python basics."],
-            metadata=[{"course_title": "Python 101", "lesson_number": 1}],
-            distances=[0.5],
-            error=None
-        )
-        self.mock_store.search.return_value = mock_results
-        self.mock_store.get_lesson_link.return_value = "https://example.com/lesson1"
-        
-        # Act
-        result = self.tool.execute(query="Python basics")
-        
-        # Assert
-        assert "[Python 101 - Lesson 1]" in result
-        assert "This is lesson content about Python basics." in result
-        self.mock_store.search.assert_called_once_with(
-            query="Python basics",
-            course_name=None,
-            lesson_number=None
-        )
-    
-    def test_execute_returns_error_message_on_empty_results(self):
-        """Test that execute returns appropriate message when no results found"""
-        # Arrange: Mock empty results
-        mock_results = SearchResults(
-            documents=[],
-            metadata=[],
-            distances=[],
-            error=None
-        )
-        self.mock_store.search.return_value = mock_results
-        
-        # Act
-        result = self.tool.execute(query="nonexistent topic")
-        
-        # Assert
-        assert "No relevant content found" in result
-    
-    def test_execute_handles_search_error(self):
-        """Test that execute properly returns error messages from vector store"""
-        # Arrange: Mock error result
-        mock_results = SearchResults.empty("Search error: Connection failed")
-        self.mock_store.search.return_value = mock_results
-        
-        # Act
-        result = self.tool.execute(query="any query")
-        
-        # Assert
-        assert "Search error" in result
+    @pytest.fixture(autouse=True)
+    def reset_tool_and_store(self, tool_and_store):
+        """Clear stub configuration and tracked sources between tests"""
+        tool, store = tool_and_store
+        store.reset()
+        tool.last_sources = []
     
-    def test_execute_passes_course_filter(self):
-        """Test that course_name filter is passed to vector store"""
-        # Arrange
-        mock_results = SearchResults(documents=[], metadata=[], distances=[])
-        self.mock_store.search.return_value = mock_results
-        
-        # Act
-        self.tool.execute(query="test", course_name="Python 101")
+    @pytest.mark.parametrize(
+        "prebuilt_results,kwargs,expected,call_kwargs,links,expected_sources",
+        EXECUTE_CASES,
+        indirect=["prebuilt_results"],
+    )
+    def test_execute(
+        self, tool_and_store, prebuilt_results, kwargs, expected, call_kwargs, links,
+        expected_sources
+    ):
+        """Test execute output, the filters passed to the vector store and sources"""
+        tool, store = tool_and_store
         
-        # Assert
-        self.mock_store.search.assert_called_once_with(
-            query="test",
-            course_name="Python 101",
-            lesson_number=None
-        )
-    
-    def test_execute_passes_lesson_filter(self):
-        """Test that lesson_number filter is passed to vector store"""
-        # Arrange
-        mock_results = SearchResults(documents=[], metadata=[], distances=[])
-        self.mock_store.search.return_value = mock_results
-        
-        # Act
-        self.tool.execute(query="test", lesson_number=3)
-        
-        # Assert
-        self.mock_store.search.assert_called_once_with(
-            query="test",
-            course_name=None,
-            lesson_number=3
-        )
-    
-    def test_execute_populates_last_sources(self):
-        """Test that execute correctly populates last_sources for UI"""
         # Arrange
-        mock_results = SearchResults(
-            documents=["Content 1", "Content 2"],
-            metadata=[
-                {"course_title": "Course A", "lesson_number": 1},
-                {"course_title": "Course B", "lesson_number": 2}
-            ],
-            distances=[0.3, 0.5]
-        )
-        self.mock_store.search.return_value = mock_results
-        self.mock_store.get_lesson_link.side_effect = [
-            "https://example.com/a/1",
-            "https://example.com/b/2"
-        ]
+        store._res = prebuilt_results
+        if links is not None:
+            store._link = iter(links)
         
         # Act
-        self.tool.execute(query="test")
+        result = tool.execute(**kwargs)
         
         # Assert
-        assert len(self.tool.last_sources) == 2
-        assert self.tool.last_sources[0]["text"] == "Course A - Lesson 1"
-        assert self.tool.last_sources[0]["link"] == "https://example.com/a/1"
-        assert self.tool.last_sources[1]["text"] == "Course B - Lesson 2"
+        assert expected in result
+        assert store.search_count == 1
+        assert store.last_kw == call_kwargs
+        if expected_sources is not None:
+            assert tool.last_sources == expected_sources
     
-    def test_execute_handles_missing_lesson_number(self):
-        """Test handling of results without lesson numbers"""
-        # Arrange
-        mock_results = SearchResults(
-            documents=["Course overview content"],
-            metadata=[{"course_title": "Python 101", "lesson_number": None}],
-            distances=[0.4]
-        )
-        self.mock_store.search.return_value = mock_results
+    @pytest.mark.benchmark(group="search_tools")
+    def test_execute_bulk(self, tool_and_store, bench_results, benchmark):
+        """Benchmark execute() formatting a large result set"""
+        tool, store = tool_and_store
+        store._res = bench_results
+        execute = tool.execute
         
-        # Act
-        result = self.tool.execute(query="overview")
+        result = benchmark(execute, query="x")
         
-        # Assert
-        assert "[Python 101]" in result
-        assert "Lesson" not in result.split("]")[0]  # No lesson in header
+        assert result.startswith("[C - Lesson 0]\nx")
+        assert len(tool.last_sources) == 100
 
 
 class TestToolManager:
     """Tests for ToolManager functionality"""
     
-    def test_tool_registration(self):
-        """Test that tools can be registered and retrieved"""
-        manager = ToolManager()
-        mock_store = Mock()
-        tool = CourseSearchTool(mock_store)
-        
-        manager.register_tool(tool)
-        
-        definitions = manager.get_tool_definitions()
-        assert len(definitions) == 1
-        assert definitions[0]["name"] == "search_course_content"
+    @pytest.fixture(autouse=True)
+    def reset_manager_with_tool(self, manager_with_tool):
+        """Clear stub configuration and tracked sources between tests"""
+        _, tool, store = manager_with_tool
+        store.reset()
+        tool.last_sources = []
     
-    def test_execute_tool_calls_correct_tool(self):
-        """Test that execute_tool routes to the correct tool"""
-        manager = ToolManager()
-        mock_store = Mock()
-        mock_results = SearchResults(documents=[], metadata=[], distances=[])
-        mock_store.search.return_value = mock_results
-        
-        tool = CourseSearchTool(mock_store)
-        manager.register_tool(tool)
+    @pytest.mark.parametrize("action,expected", [
+        pytest.param(("register",), "search_course_content", id="registration"),
+        pytest.param(
+            ("execute", "search_course_content"), "No relevant content found", id="routes"
+        ),
+        pytest.param(("execute", "nonexistent_tool"), "not found", id="unknown"),
+        pytest.param(
+            ("sources",), [{"text": "Test - Lesson 1", "link": None}], id="last_sources"
+        ),
+    ])
+    def test_tool_manager(self, manager_with_tool, action, expected):
+        """Test registration, routing, unknown tools and source retrieval"""
+        manager, _, store = manager_with_tool
         
-        result = manager.execute_tool("search_course_content", query="test")
-        
-        assert "No relevant content found" in result
-    
-    def test_execute_tool_unknown_tool(self):
-        """Test handling of unknown tool names"""
-        manager = ToolManager()
-        
-        result = manager.execute_tool("nonexistent_tool", query="test")
-        
-        assert "not found" in result
-    
-    def test_get_last_sources(self):
-        """Test retrieval of sources from tools"""
-        manager = ToolManager()
-        mock_store = Mock()
-        mock_results = SearchResults(
-            documents=["content"],
-            metadata=[{"course_title": "Test", "lesson_number": 1}],
-            distances=[0.5]
-        )
-        mock_store.search.return_value = mock_results
-        mock_store.get_lesson_link.return_value = None
-        
-        tool = CourseSearchTool(mock_store)
-        manager.register_tool(tool)
-        manager.execute_tool("search_course_content", query="test")
-        
-        sources = manager.get_last_sources()
-        assert len(sources) == 1
-        assert sources[0]["text"] == "Test - Lesson 1"
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+        if action[0] == "register":
+            definitions = manager.get_tool_definitions()
+            assert [d["name"] for d in definitions] == [expected]
+        elif action[0] == "execute":
+            store._res = _EMPTY
+            result = manager.execute_tool(action[1], query="test")
+            assert expected in result
+        elif action[0] == "sources":
+            store._res = _TEST_HIT
+            manager.execute_tool("search_course_content", query="test")
+            assert manager.get_last_sources() == expected